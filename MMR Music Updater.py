@@ -1,21 +1,44 @@
 # Set to True to use spinner, false to show full file logs
 USE_SPINNER = True
+# Set to True to build .zseq conversions in memory, false to build them in a temp folder
+USE_FAST_STANDALONE = True
+# Set to True to read, convert, and write files in separate stages at the same time, false to convert each file in one thread
+USE_PIPELINE = True
+# Set to True to pack .mmrs files with sorted members, fixed timestamps, and fixed permissions, so identical inputs give identical files
+USE_DETERMINISTIC_ARCHIVES = True
 
 import time
 import sys
+import io
+import mmap
 import itertools
 import threading
 import os
+import json
+import queue
 import logging
+import logging.handlers
+import cProfile
+import pstats
+import tracemalloc
 from concurrent.futures import ThreadPoolExecutor
-from typing import Final
+from contextlib import contextmanager, nullcontext
+from typing import Final, Iterable, Iterator
 from collections import defaultdict
 import unicodedata
 import yaml
 import zipfile
+import tarfile
+import posixpath
+import ntpath
 import shutil
+import stat
 import tempfile
 import re
+import zlib
+import struct
+import hashlib
+import argparse
 
 
 try:
@@ -29,8 +52,6 @@ except ImportError:
     USE_CATEGORY_ENUM = False
     USE_NEW_LINKING = False
 
-FILES = sys.argv[1:]
-
 # ANSI Terminal Color Codes
 RED: Final        = '\x1b[31m'
 PINK_218: Final   = '\x1b[38;5;218m'
@@ -68,6 +89,35 @@ SEQ_EXTS: Final[tuple[str, ...]] = (
     '.zseq',
 )
 
+BUNDLE_EXTS: Final[tuple[str, ...]] = (
+    '.zip',
+    '.tar',
+    '.tar.gz',
+    '.tgz',
+    '.tar.bz2',
+    '.tar.xz',
+)
+
+MANIFEST_NAME: Final = '.mmrs-manifest.json'
+
+# Timestamp and permissions given to every member of a deterministic archive, the timestamp being the earliest a zip can store
+ARCHIVE_DATE_TIME: Final = (1980, 1, 1, 0, 0, 0)
+ARCHIVE_FILE_MODE: Final = 0o644
+
+# Worker threads for each stage of the conversion pipeline, and the number of files that can wait between stages
+PIPELINE_READ_WORKERS: Final      = 8
+PIPELINE_TRANSFORM_WORKERS: Final = os.cpu_count() or 4
+PIPELINE_WRITE_WORKERS: Final     = 4
+PIPELINE_QUEUE_SIZE: Final        = 32
+
+# Seconds between each autotuner sample, the most workers it will give a stage, and the throughput gain a new worker must give to be kept
+AUTOTUNE_INTERVAL: Final    = 2.0
+AUTOTUNE_MAX_WORKERS: Final = 32
+AUTOTUNE_MIN_GAIN: Final    = 0.05
+
+# Seconds between each traced memory sample taken for --profile-memory
+PROFILE_MEMORY_INTERVAL: Final = 0.01
+
 FANFARE_CATEGORIES: Final[list[int]] = [
     # GROUPS
     0x8, 0x9, 0x10,
@@ -82,6 +132,15 @@ FANFARE_CATEGORIES: Final[list[int]] = [
 done_flag = threading.Event()
 spinner_thread = threading.Thread()
 
+# Worker counts of each pipeline stage, which the autotuner changes unless they are pinned with --workers
+pipeline_workers: list[int] = [PIPELINE_READ_WORKERS, PIPELINE_TRANSFORM_WORKERS, PIPELINE_WRITE_WORKERS]
+use_autotune: bool = True
+
+# How many .mmrs files were written, left untouched because their contents were unchanged,
+# or skipped without converting because a .zseq was already converted, shown in the run summary
+write_counts: dict[str, int] = {'written': 0, 'unchanged': 0, 'skipped': 0}
+_write_counts_lock = threading.Lock()
+
 
 def spinner_task(message: str, done_flag: threading.Event) -> None:
     for frame in itertools.cycle(SPINNER_FRAMES):
@@ -111,20 +170,252 @@ def start_spinner(message: str):
     return thread
 
 
+ERROR_LOG_PATH: Final     = 'mmr-music-updater_errors.log'
+ERROR_REPORT_PATH: Final  = 'mmr-music-updater_errors.jsonl'
+VERIFY_REPORT_PATH: Final = 'mmr-music-updater_verify.jsonl'
+
 logger = logging.getLogger('mmr_music_updater')
 logger.setLevel(logging.ERROR)
 logger.propagate = False
-_log_handler = None
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener: logging.handlers.QueueListener = None
+_log_lock = threading.Lock()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    ''' Formats a failed input's log record as a single JSON object '''
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps({
+            "time": self.formatTime(record),
+            "input": record.input_file,
+            "stage": record.stage,
+            "reason": record.reason,
+        }, ensure_ascii=False)
+
+
+def start_error_logging(report_path: str = ERROR_REPORT_PATH) -> None:
+    ''' Starts the background thread that writes the error log and the per-run error report '''
+    global _log_listener
+    with _log_lock:
+        if _log_listener is not None:
+            return
+
+        log_handler = logging.FileHandler(ERROR_LOG_PATH, mode='a', encoding='utf-8', delay=True)
+        log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+        # The report is rewritten every run, so an empty report means nothing failed
+        report_handler = logging.FileHandler(report_path, mode='w', encoding='utf-8')
+        report_handler.setFormatter(JsonLinesFormatter())
+        report_handler.addFilter(lambda record: hasattr(record, 'input_file'))
+
+        _log_listener = logging.handlers.QueueListener(_log_queue, log_handler, report_handler)
+        _log_listener.start()
+
+
+def stop_error_logging() -> None:
+    ''' Flushes any queued errors to disk and stops the background writer '''
+    global _log_listener
+    with _log_lock:
+        if _log_listener is None:
+            return
+
+        _log_listener.stop()
+        for handler in _log_listener.handlers:
+            handler.close()
+        _log_listener = None
+
+
+def log_error(message: str, exc_info=True, input_file: str = None, stage: str = None, reason: str = None):
+    start_error_logging()
+
+    extra = None
+    if input_file is not None:
+        extra = {"input_file": input_file, "stage": stage, "reason": reason}
+
+    logger.error(message, exc_info=exc_info, extra=extra)
+
+
+class RunProfiler:
+    ''' Collects cProfile stats from every worker thread, and optionally the tracemalloc peak while each conversion stage runs '''
+
+    def __init__(self, stats_path: str, trace_memory: bool) -> None:
+        self.stats_path = stats_path
+        self.trace_memory = trace_memory
+        self.profiles: list[cProfile.Profile] = []
+        self.stage_peaks: dict[str, tuple[int, tracemalloc.Snapshot]] = {}
+        self.lock = threading.Lock()
+
+        # Thread pool workers run many calls, which share one profiler per thread
+        self.thread_profiles = threading.local()
+
+        # Stages only count how many threads are inside them, and a sampler thread reads and resets the peak,
+        # so threads and nested stages cannot reset each other's peaks, and snapshots are not taken in profiled code
+        self.active_stages: defaultdict[str, int] = defaultdict(int)
+        self.sampled_stages: set[str] = set()
+        self.stopped = threading.Event()
+        self.sampler = threading.Thread(target=self.sample_memory, daemon=True)
+
+    @contextmanager
+    def profile_thread(self):
+        ''' Profiles the current thread until the block exits '''
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from the first profiler enabled, so this thread is already included
+            yield
+            return
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self.lock:
+                self.profiles.append(profiler)
+
+    @contextmanager
+    def profile_call(self):
+        ''' Profiles a call with the current thread's profiler, creating it on the thread's first call '''
+        profiler = getattr(self.thread_profiles, 'profiler', None)
+        if profiler is None:
+            profiler = cProfile.Profile()
+
+        try:
+            profiler.enable()
+        except ValueError:
+            # Python 3.12+ profiles every thread from the first profiler enabled, so this thread is already included
+            yield
+            return
+
+        if getattr(self.thread_profiles, 'profiler', None) is None:
+            self.thread_profiles.profiler = profiler
+            with self.lock:
+                self.profiles.append(profiler)
+
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+    def start_stage(self, stage: str) -> None:
+        ''' Marks a stage as running on the current thread, so the next memory sample counts towards it '''
+        with self.lock:
+            self.active_stages[stage] += 1
+            self.sampled_stages.add(stage)
+
+    def end_stage(self, stage: str) -> None:
+        ''' Marks a stage as no longer running on the current thread '''
+        with self.lock:
+            self.active_stages[stage] -= 1
+
+    def start_sampling(self) -> None:
+        self.sampler.start()
+
+    def stop_sampling(self) -> None:
+        self.stopped.set()
+        self.sampler.join()
+
+    def sample_memory(self) -> None:
+        ''' Records the traced memory peak of each interval until stopped, then once more for the last interval '''
+        while not self.stopped.wait(PROFILE_MEMORY_INTERVAL):
+            self.record_peak()
+
+        self.record_peak()
+
+    def record_peak(self) -> None:
+        ''' Records the traced memory peak since the last sample for every stage that ran in between, taking a snapshot when it is a stage's highest '''
+        with self.lock:
+            stages = self.sampled_stages
+            self.sampled_stages = {stage for stage, count in self.active_stages.items() if count > 0}
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        # Snapshots are slow, so one is only taken for samples that set a new peak, and shared by every stage it set it for
+        new_peak_stages = [stage for stage in stages if peak > self.stage_peaks.get(stage, (0, None))[0]]
+        if new_peak_stages:
+            snapshot = tracemalloc.take_snapshot()
+            for stage in new_peak_stages:
+                self.stage_peaks[stage] = (peak, snapshot)
+
+    @staticmethod
+    def is_own_function(func: tuple[str, int, str]) -> bool:
+        ''' Checks if a profiled function belongs to memory sampling, which Python 3.12+ profiles along with every other thread '''
+        filename, _, name = func
+        return filename == tracemalloc.__file__ or name.startswith('<built-in method _tracemalloc.') or name in ('sample_memory', 'record_peak')
+
+    def merge(self) -> pstats.Stats:
+        ''' Merges the stats of every profiled thread and writes them to the stats file '''
+        stats = pstats.Stats(self.profiles[0])
+        for profiler in self.profiles[1:]:
+            stats.add(profiler)
+
+        stats.dump_stats(self.stats_path)
+        return stats
+
+
+_profiler: RunProfiler = None
+_main_profile = nullcontext()
+
+
+def start_profiling(stats_path: str, trace_memory: bool) -> None:
+    ''' Starts profiling the main thread, and every worker thread started afterwards '''
+    global _profiler, _main_profile
+    _profiler = RunProfiler(stats_path, trace_memory)
+
+    if trace_memory:
+        tracemalloc.start()
+        _profiler.start_sampling()
+
+    _main_profile = _profiler.profile_thread()
+    _main_profile.__enter__()
 
 
-def log_error(message: str, exc_info=True):
-    global _log_handler
-    if _log_handler is None:
-        _log_handler = logging.FileHandler('mmr-music-updater_errors.log', mode='a', encoding='utf-8')
-        _log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
-        logger.addHandler(_log_handler)
+def profile_worker():
+    ''' Profiles the current worker thread if profiling is on '''
+    return _profiler.profile_thread() if _profiler is not None else nullcontext()
 
-    logger.error(message, exc_info=exc_info)
+
+def call_profiled(func, *args):
+    ''' Calls a function in a thread pool worker, profiling it with the worker's profiler if profiling is on '''
+    with _profiler.profile_call() if _profiler is not None else nullcontext():
+        return func(*args)
+
+
+def stop_profiling(top_count: int) -> None:
+    ''' Stops profiling, writes the merged stats file, and prints the hottest functions and each stage's memory peak '''
+    global _profiler
+    _main_profile.__exit__(None, None, None)
+    if _profiler.trace_memory:
+        _profiler.stop_sampling()
+
+    stats = _profiler.merge()
+
+    print(f"{CYAN}Top {top_count} functions by own time{RESET} {GRAY_245}(all threads, saved to {_profiler.stats_path}){RESET}")
+    print(f"{GRAY_248}  {'own s':>9} {'total s':>9} {'calls':>9}  function{RESET}")
+
+    profiled = [item for item in stats.stats.items() if not _profiler.is_own_function(item[0])]
+    hottest = sorted(profiled, key=lambda item: item[1][2], reverse=True)[:top_count]
+    for func, (_, call_count, own_time, total_time, _) in hottest:
+        print(f"  {own_time:9.3f} {total_time:9.3f} {call_count:9d}  {pstats.func_std_string(func)}")
+
+    if _profiler.trace_memory:
+        # Stages run on many threads at once, so a peak includes memory held by whatever else was running at the time
+        print(f"{CYAN}Peak traced memory while each stage ran{RESET} {GRAY_245}(whole process, sampled every {PROFILE_MEMORY_INTERVAL * 1000:g} ms){RESET}")
+
+        for stage, (peak, snapshot) in sorted(_profiler.stage_peaks.items()):
+            print(f"  {stage}: {peak / (1024 * 1024):.2f} MiB")
+            snapshot = snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ])
+            for statistic in snapshot.statistics('lineno')[:3]:
+                print(f"{GRAY_248}    {statistic}{RESET}")
+
+        tracemalloc.stop()
+
+    _profiler = None
 
 
 def remove_diacritics(text: str) -> str:
@@ -140,6 +431,103 @@ class SkipFileException(Exception):
     pass
 
 
+class ConversionError(Exception):
+    ''' Exception to be raised if a file fails to convert, storing the stage it failed in '''
+
+    def __init__(self, stage: str, reason) -> None:
+        super().__init__(reason)
+        self.stage = stage
+
+
+@contextmanager
+def conversion_stage(stage: str):
+    ''' Tags any exception raised inside the block with the conversion stage it happened in '''
+    profiler = _profiler if _profiler is not None and _profiler.trace_memory else None
+    if profiler is not None:
+        profiler.start_stage(stage)
+
+    try:
+        yield
+    except (ConversionError, SkipFileException):
+        raise
+    except Exception as e:
+        raise ConversionError(stage, e) from e
+    finally:
+        if profiler is not None:
+            profiler.end_stage(stage)
+
+
+class MappedFile(mmap.mmap):
+    ''' Read-only memory-mapped file, which zipfile can read members from directly '''
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, pos: int, whence: int = os.SEEK_SET):
+        # Regular files raise OSError for an invalid seek, which zipfile expects for files that are too small
+        try:
+            return super().seek(pos, whence)
+        except ValueError as e:
+            raise OSError(e)
+
+    def prefault(self) -> None:
+        ''' Reads every page of the mapping from disk now, instead of when it is first touched '''
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            self.madvise(mmap.MADV_WILLNEED)
+
+        for offset in range(0, len(self), mmap.PAGESIZE):
+            self[offset]
+
+
+def map_input(filepath: str) -> MappedFile | bytes:
+    ''' Memory-maps a source file, so workers share it through the page cache instead of copying it '''
+    with open(filepath, 'rb') as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+
+        return MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+@contextmanager
+def mapped_view(filepath: str):
+    ''' Memory-maps a source file, yielding a memoryview of its data that is released afterwards '''
+    data = map_input(filepath)
+    view = memoryview(data)
+
+    try:
+        yield view
+    finally:
+        # A traceback can still hold views of the data, and failing to close must not replace the error that caused it
+        try:
+            view.release()
+            if isinstance(data, MappedFile):
+                data.close()
+        except BufferError:
+            pass
+
+
+def stored_member_data(view: memoryview, info: zipfile.ZipInfo) -> memoryview | None:
+    ''' Gets a stored zip member as a slice of the archive's data instead of a copy, or None if it has to be decompressed '''
+    if info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+        return None
+
+    # The local header's name and extra field lengths can differ from the central directory's, so its own are used
+    header = view[info.header_offset:info.header_offset + 30]
+    if len(header) != 30 or header[:4] != b'PK\x03\x04':
+        raise zipfile.BadZipFile(f"Bad local header for file {info.filename!r}")
+
+    name_length, extra_length = struct.unpack_from('<HH', header, 26)
+    start = info.header_offset + 30 + name_length + extra_length
+    member = view[start:start + info.compress_size]
+
+    # zipfile checks this while reading, so skipping the copy must not skip the check
+    if len(member) != info.file_size or zlib.crc32(member) != info.CRC:
+        raise zipfile.BadZipFile(f"Bad CRC-32 for file {info.filename!r}")
+
+    return member
+
+
 class StandaloneSequence:
     ''' Represents a .zseq file storing its metadata '''
 
@@ -166,7 +554,7 @@ class StandaloneSequence:
 class MusicArchive:
     ''' Represents an .mmrs file storing its contents '''
 
-    def __init__(self, tempfolder):
+    def __init__(self, tempfolder=None):
         self.sequences: list[tuple[str, str]] = []
         self.categories: str = None
         self.banks: dict[str, tuple[str, str]] = {}
@@ -174,6 +562,9 @@ class MusicArchive:
         self.zsounds: dict[str, int] = {}
         self.tempfolder = tempfolder
 
+        # Only used when the archive is loaded into memory instead of a temp folder
+        self.files: dict[str, bytes | memoryview] = {}
+
         self.sample_counter: int = 1
 
     def unpack(self, filepath: str) -> None:
@@ -181,26 +572,71 @@ class MusicArchive:
         if os.path.exists(self.tempfolder):
             os.rmdir(self.tempfolder)
 
-        with zipfile.ZipFile(filepath, 'r') as zip_archive:
+        data = map_input(filepath)
+
+        try:
+            with zipfile.ZipFile(data if isinstance(data, MappedFile) else io.BytesIO(data), 'r') as zip_archive:
+                for f in zip_archive.namelist():
+                    if f.endswith(".metadata"):
+                        raise SkipFileException("Archive contains .metadata, skipping.")
+                zip_archive.extractall(self.tempfolder)
+        finally:
+            if isinstance(data, MappedFile):
+                data.close()
+
+        self.sort_files(os.listdir(self.tempfolder), filepath)
+
+    def load(self, data: MappedFile | bytes, filepath: str) -> None:
+        ''' Loads the contents of an .mmrs file into memory instead of unpacking it, using stored members straight from its data '''
+        view = memoryview(data)
+
+        with zipfile.ZipFile(data if isinstance(data, MappedFile) else io.BytesIO(data), 'r') as zip_archive:
             for f in zip_archive.namelist():
                 if f.endswith(".metadata"):
                     raise SkipFileException("Archive contains .metadata, skipping.")
-            zip_archive.extractall(self.tempfolder)
 
+            self.files = {
+                info.filename: stored_member_data(view, info) or zip_archive.read(info)
+                for info in zip_archive.infolist()
+                if not info.is_dir() and '/' not in info.filename
+            }
+
+        self.sort_files(list(self.files), filepath)
+
+    def find_file(self, filename: str) -> str | None:
+        ''' Finds the name a file is stored under ignoring case, since old archives were made on case-insensitive Windows filesystems '''
+        names = self.files if self.tempfolder is None else os.listdir(self.tempfolder)
+        if filename in names:
+            return filename
+
+        return next((name for name in names if name.lower() == filename.lower()), None)
+
+    def has_file(self, filename: str) -> bool:
+        ''' Checks if the archive contains a file '''
+        return self.find_file(filename) is not None
+
+    def sort_files(self, filenames: list[str], filepath: str) -> None:
+        ''' Sorts the archive's files by what they are used for '''
         self.sample_counter = 1
-        for f in os.listdir(self.tempfolder):
+
+        # Unnamed samples are numbered in file order, so sort the files to number them the same way every time
+        if USE_DETERMINISTIC_ARCHIVES:
+            filenames = sorted(filenames)
+
+        for f in filenames:
             filename = os.path.basename(f)
-            base_name, extension = os.path.splitext(f)
-            extension = extension.lower()
+            base_name, stored_extension = os.path.splitext(f)
+            extension = stored_extension.lower()
 
             match extension:
                 case _ if extension in SEQ_EXTS:
-                    self.sequences.append((base_name, extension))
+                    # Keep the extension as stored, so the sequence can be found again however it is cased
+                    self.sequences.append((base_name, stored_extension))
                     continue
 
                 case '.zbank':
-                    bankmeta_path = f'{base_name}.bankmeta'
-                    if not os.path.exists(os.path.join(self.tempfolder, bankmeta_path)):
+                    bankmeta_path = self.find_file(f'{base_name}.bankmeta')
+                    if bankmeta_path is None:
                         raise FileNotFoundError(f'Missing bankmeta for {filepath}!')
                     self.banks[base_name] = (filename, bankmeta_path)
                     continue
@@ -213,7 +649,7 @@ class MusicArchive:
                     self.process_zsounds(filename)
                     continue
 
-                case _ if f == 'categories.txt':
+                case _ if f.lower() == 'categories.txt':
                     self.categories = f
                     continue
 
@@ -228,7 +664,7 @@ class MusicArchive:
 
     def process_zsounds(self, file: str):
         ''' Extracts custom audio sample metadata from every .zsound file's filename '''
-        base_name: str = file.split(".zsound")[0]
+        base_name: str = os.path.splitext(file)[0]
         parts: tuple = base_name.split("_")
 
         sample_name: str = ""
@@ -250,6 +686,18 @@ class MusicArchive:
         except ValueError as e:
             raise ValueError(f"process_zsounds Error: {e}")
 
+        if self.tempfolder is None:
+            new_name = f"{sample_name}.zsound"
+
+            suffix: int = 1
+            while new_name in self.files:
+                new_name = f"{sample_name}{suffix}.zsound"
+                suffix += 1
+
+            self.files[new_name] = self.files.pop(file)
+            self.zsounds[os.path.splitext(new_name)[0]] = HexInt(temp_address)
+            return
+
         old_path = os.path.join(self.tempfolder, file)
         new_path = os.path.join(self.tempfolder, f"{sample_name}.zsound")
 
@@ -266,6 +714,68 @@ class MusicArchive:
         self.zsounds[os.path.splitext(os.path.basename(new_path))[0]] = HexInt(temp_address)
 
 
+def is_bundle(filepath: str) -> bool:
+    ''' Checks if a file is a .zip or .tar bundle of an old library '''
+    return filepath.lower().endswith(BUNDLE_EXTS)
+
+
+def strip_bundle_ext(filepath: str) -> str:
+    ''' Removes the bundle extension from a path, including both parts of extensions like .tar.gz '''
+    for extension in sorted(BUNDLE_EXTS, key=len, reverse=True):
+        if filepath.lower().endswith(extension):
+            return filepath[:-len(extension)]
+
+    return filepath
+
+
+class MusicBundle:
+    ''' Represents a .zip or .tar bundle of an old library, reading its music files without extracting it '''
+
+    def __init__(self, bundle_path: str) -> None:
+        self.bundle_path = bundle_path
+        self.is_zip = bundle_path.lower().endswith('.zip')
+
+    @staticmethod
+    def clean_member_path(name: str) -> str | None:
+        ''' Normalizes a member path to forward slashes, or returns None if it points outside the bundle '''
+        path = posixpath.normpath(name.replace('\\', '/'))
+
+        if path.startswith(('/', '../')) or path == '..':
+            return None
+
+        # A drive like C: would be joined onto the output folder as a separate root on Windows
+        if ntpath.splitdrive(path)[0]:
+            return None
+
+        return path
+
+    def names(self) -> list[str]:
+        ''' Lists the path of every music file in the bundle in one pass, reading only the zip directory or the tar headers '''
+        if self.is_zip:
+            with zipfile.ZipFile(self.bundle_path, 'r') as zip_bundle:
+                names = [info.filename for info in zip_bundle.infolist() if not info.is_dir()]
+        else:
+            with tarfile.open(self.bundle_path, 'r|*') as tar_bundle:
+                names = [member.name for member in tar_bundle if member.isfile()]
+
+        return [path for name in names if is_music_file(name) and (path := self.clean_member_path(name))]
+
+    def members(self) -> Iterator[tuple[str, str | None, bytes]]:
+        ''' Yields the name, cleaned path, and data of each music file in the order it is stored '''
+        if self.is_zip:
+            with zipfile.ZipFile(self.bundle_path, 'r') as zip_bundle:
+                for info in zip_bundle.infolist():
+                    if not info.is_dir() and is_music_file(info.filename):
+                        yield info.filename, self.clean_member_path(info.filename), zip_bundle.read(info)
+
+        else:
+            # Stream mode reads the tar in one pass, so compressed bundles are never decompressed twice
+            with tarfile.open(self.bundle_path, 'r|*') as tar_bundle:
+                for member in tar_bundle:
+                    if member.isfile() and is_music_file(member.name):
+                        yield member.name, self.clean_member_path(member.name), tar_bundle.extractfile(member).read()
+
+
 class FlowStyleList(list):
     pass
 
@@ -286,9 +796,8 @@ yaml.add_representer(FlowStyleList, represent_flow_style_list)
 yaml.add_representer(HexInt, represent_hexint)
 
 
-def write_metadata(folder: str, base_name: str, cosmetic_name: str, instrument_set, song_type: str, categories, zsounds: dict[str, dict[str, int]] = None, formmask: list[str] = None):
-    metadata_file_path = f"{folder}/{base_name}.metadata"
-
+def create_metadata(cosmetic_name: str, instrument_set, song_type: str, categories, zsounds: dict[str, dict[str, int]] = None, formmask: list[str] = None) -> str:
+    ''' Creates the YAML text of a .metadata file '''
     yaml_dict: dict = {
         "game": "mm",
         "metadata": {
@@ -304,25 +813,23 @@ def write_metadata(folder: str, base_name: str, cosmetic_name: str, instrument_s
     }
 
     if zsounds:
-        yaml_dict["metadata"]["audio samples"] = zsounds
+        yaml_dict["metadata"]["audio samples"] = dict(sorted(zsounds.items())) if USE_DETERMINISTIC_ARCHIVES else zsounds
 
-    with open(metadata_file_path, "w", encoding="utf-8") as f:
-        yaml.dump(yaml_dict, f, sort_keys=False, allow_unicode=True)
+    metadata: str = yaml.dump(yaml_dict, sort_keys=False, allow_unicode=True)
 
     # if formmask:
-    #   with open(metadata_file_path, 'a', encoding='utf-8') as f:
-    #     f.write("formmask: [\n")
+    #   metadata += "formmask: [\n"
 
-    #     for i, value in enumerate(formmask):
-    #       comment = f"Channel {i}" if i < 16 else "Cumulative States"
-    #       f.write(f'  "{value}"')
+    #   for i, value in enumerate(formmask):
+    #     comment = f"Channel {i}" if i < 16 else "Cumulative States"
+    #     metadata += f'  "{value}"'
 
-    #       if i != len(formmask) - 1:
-    #         f.write(",")
+    #     if i != len(formmask) - 1:
+    #       metadata += ","
 
-    #       f.write(f" # {comment}\n")
+    #     metadata += f" # {comment}\n"
 
-    #     f.write("]\n")
+    #   metadata += "]\n"
 
     if formmask:
         formmask_dict = {}
@@ -337,12 +844,20 @@ def write_metadata(folder: str, base_name: str, cosmetic_name: str, instrument_s
 
             formmask_dict[key] = states
 
-        with open(metadata_file_path, "a", encoding="utf-8") as f:
-            f.write(f"formmask:\n")
+        metadata += f"formmask:\n"
+
+        for key, values in formmask_dict.items():
+            list_items = ", ".join(f'{v}' for v in values)
+            metadata += f"  {key}: [{list_items}]\n"
+
+    return metadata
 
-            for key, values in formmask_dict.items():
-                list_items = ", ".join(f'{v}' for v in values)
-                f.write(f"  {key}: [{list_items}]\n")
+
+def write_metadata(folder: str, base_name: str, cosmetic_name: str, instrument_set, song_type: str, categories, zsounds: dict[str, dict[str, int]] = None, formmask: list[str] = None):
+    metadata_file_path = f"{folder}/{base_name}.metadata"
+
+    with open(metadata_file_path, "w", encoding="utf-8") as f:
+        f.write(create_metadata(cosmetic_name, instrument_set, song_type, categories, zsounds, formmask))
 
 
 def clean_cosmetic_name(filename: str) -> str:
@@ -382,6 +897,11 @@ def parse_categories_and_song_type(category_filepath: str, filename: str) -> tup
     with open(category_filepath, 'r') as f:
         raw_categories = f.readline().strip()
 
+    return parse_categories_text(raw_categories, filename)
+
+
+def parse_categories_text(raw_categories: str, filename: str) -> tuple[list, str]:
+    ''' Parses the first line of a categories file and gets the song type for an .mmrs file '''
     if '-' in raw_categories:
         parts = raw_categories.split('-')
     else:
@@ -406,122 +926,274 @@ def parse_categories_and_song_type(category_filepath: str, filename: str) -> tup
     return categories, song_type
 
 
-def copy_unprocessed_files(source_dir: str, destination_dir: str) -> None:
-    ''' Copies files that are not processed from the sequence file's folder to the temp folder '''
+def is_processed_file(file: str) -> bool:
+    ''' Checks if a file in an old .mmrs file is processed, instead of copied as is '''
     skip_extensions: list[str] = ['.seq', '.zseq', '.aseq', '.zbank', '.bankmeta', '.zsound', '.formmask']
     skip_categories: str = 'categories.txt'
 
-    for file in os.listdir(source_dir):
-        name: str = os.path.basename(file)
-        extension: str = os.path.splitext(file)[1]
+    name: str = os.path.basename(file)
+    extension: str = os.path.splitext(file)[1]
+
+    return extension.lower() in skip_extensions or name.lower() == skip_categories
 
-        if extension.lower() in skip_extensions or name.lower() == skip_categories:
+
+def copy_unprocessed_files(source_dir: str, destination_dir: str) -> None:
+    ''' Copies files that are not processed from the sequence file's folder to the temp folder '''
+    for file in os.listdir(source_dir):
+        if is_processed_file(file):
             continue
 
         shutil.copyfile(os.path.join(source_dir, file), os.path.join(destination_dir, file))
 
 
-def pack(filename: str, tempfolder: str, destination_dir: str) -> None:
-    '''Packs the temp folder into a new .mmrs file'''
+def count_write(outcome: str) -> None:
+    ''' Counts a .mmrs file as written, unchanged, or skipped for the run summary '''
+    with _write_counts_lock:
+        write_counts[outcome] += 1
+
+
+def hash_file(filepath: str) -> bytes:
+    ''' Hashes the contents of a file in chunks '''
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        while chunk := f.read(1024 * 1024):
+            digest.update(chunk)
+
+    return digest.digest()
+
+
+def is_unchanged(mmrs_path: str, data: bytes = None, new_path: str = None) -> bool:
+    ''' Checks if an existing .mmrs file has the same contents as new data or a newly written file, comparing sizes before hashing '''
+    try:
+        new_size = len(data) if data is not None else os.path.getsize(new_path)
+        if os.path.getsize(mmrs_path) != new_size:
+            return False
+
+        new_hash = hashlib.sha256(data).digest() if data is not None else hash_file(new_path)
+        return hash_file(mmrs_path) == new_hash
+
+    except FileNotFoundError:
+        return False
+
+
+def pack(filename: str, tempfolder: str, destination_dir: str) -> str:
+    '''Packs the temp folder into a new .mmrs file, returning its path'''
+    # make_archive stores each file's timestamps in directory order, so build deterministic archives from the file contents instead
+    if USE_DETERMINISTIC_ARCHIVES:
+        members: list[tuple[str, bytes | memoryview]] = []
+        for root, _, files in os.walk(tempfolder):
+            for name in files:
+                with open(os.path.join(root, name), 'rb') as f:
+                    members.append((os.path.relpath(os.path.join(root, name), tempfolder).replace(os.sep, '/'), f.read()))
+
+        return write_archive(filename, build_archive(members), destination_dir)
+
     archive_base = os.path.join(destination_dir, filename)
     zip_path = f"{archive_base}.zip"
     mmrs_path = f"{archive_base}.mmrs"
 
     shutil.make_archive(archive_base, 'zip', tempfolder)
 
-    if os.path.exists(mmrs_path):
-        os.remove(mmrs_path)
+    # Leave an identical existing file untouched, so its mtime and inode are kept for rsync and backups
+    if is_unchanged(mmrs_path, new_path=zip_path):
+        os.remove(zip_path)
+        count_write('unchanged')
+        return mmrs_path
+
+    os.replace(zip_path, mmrs_path)
+    count_write('written')
+
+    return mmrs_path
+
+
+def archive_member_info(name: str) -> zipfile.ZipInfo:
+    '''Creates the header of a deterministic archive member, with a fixed timestamp, permissions, and host system'''
+    info = zipfile.ZipInfo(name, date_time=ARCHIVE_DATE_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = (stat.S_IFREG | ARCHIVE_FILE_MODE) << 16
+    # ZipInfo records the system it was made on, which would make archives built on Windows differ
+    info.create_system = 3
+
+    return info
+
+
+def build_archive(members: list[tuple[str, bytes | memoryview]]) -> bytes:
+    '''Builds the data of a new .mmrs file from in-memory files'''
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_archive:
+        if USE_DETERMINISTIC_ARCHIVES:
+            for name, data in sorted(members, key=lambda member: member[0]):
+                zip_archive.writestr(archive_member_info(name), data)
+        else:
+            for name, data in members:
+                zip_archive.writestr(name, data)
+
+    return buffer.getvalue()
+
+
+def write_archive(filename: str, data: bytes, destination_dir: str) -> str:
+    '''Writes the data of a new .mmrs file to disk once, returning its path'''
+    archive_base = os.path.join(destination_dir, filename)
+    zip_path = f"{archive_base}.zip"
+    mmrs_path = f"{archive_base}.mmrs"
 
-    os.rename(zip_path, mmrs_path)
+    # Leave an identical existing file untouched, so its mtime and inode are kept for rsync and backups
+    if is_unchanged(mmrs_path, data):
+        count_write('unchanged')
+        return mmrs_path
 
+    with open(zip_path, 'wb') as f:
+        f.write(data)
 
-def convert_standalone(input_file: str, destination_dir: str) -> None:
-    ''' Converts a .zseq file into the YAML metadata .mmrs format '''
+    os.replace(zip_path, mmrs_path)
+    count_write('written')
+
+    return mmrs_path
+
+
+def pack_in_memory(filename: str, members: list[tuple[str, bytes | memoryview]], destination_dir: str) -> str:
+    '''Packs in-memory files into a new .mmrs file, writing the archive to disk once and returning its path'''
+    return write_archive(filename, build_archive(members), destination_dir)
+
+
+def parse_standalone(standalone_seq: StandaloneSequence, filename: str) -> tuple[str, int, list, str]:
+    ''' Gets the cosmetic name, instrument set, categories, and song type of a .zseq file '''
+    cosmetic_name = clean_cosmetic_name(standalone_seq.filename)
+    instrument_set = standalone_seq.instrument_set
+
+    # 0x28 and higher indicate a custom instrument bank
+    if instrument_set > 0x27:
+        raise ValueError(
+            f'ERROR: Error processing zseq file: {filename}.zseq! Instrument bank outside valid values!')
+
+    categories = parse_categories(standalone_seq.categories)
+    song_type = get_song_type(categories, filename)
+
+    return cosmetic_name, instrument_set, categories, song_type
+
+
+def transform_standalone(sequence_data: bytes | memoryview, filename: str) -> list[tuple[str, bytes]]:
+    ''' Converts the data of a .zseq file in memory, returning the name and data of the new .mmrs file '''
+    with conversion_stage('parse'):
+        standalone_seq = StandaloneSequence(filename, None)
+        cosmetic_name, instrument_set, categories, song_type = parse_standalone(standalone_seq, filename)
+
+    with conversion_stage('metadata'):
+        metadata = create_metadata(cosmetic_name, instrument_set, song_type, categories)
+
+    with conversion_stage('pack'):
+        return [(standalone_seq.filename, build_archive([
+            (f"{standalone_seq.filename}.seq", sequence_data),
+            (f"{standalone_seq.filename}.metadata", metadata.encode('utf-8')),
+        ]))]
+
+
+def convert_standalone_in_memory(filepath: str, filename: str, destination_dir: str) -> list[str]:
+    ''' Converts a .zseq file without a temp folder by building the .mmrs file in memory '''
+    with conversion_stage('read'), mapped_view(filepath) as sequence_data:
+        outputs = transform_standalone(sequence_data, filename)
+
+    with conversion_stage('pack'):
+        return [write_archive(name, data, destination_dir) for name, data in outputs]
+
+
+def convert_standalone(input_file: str, destination_dir: str) -> list[str]:
+    ''' Converts a .zseq file into the YAML metadata .mmrs format, returning the converted file paths '''
     filename = os.path.splitext(os.path.basename(input_file))[0]
     filepath = os.path.abspath(input_file)
 
     # If the file already exists, return
     if os.path.isfile(f"{destination_dir}/{filename}.mmrs"):
-        return
+        count_write('skipped')
+        return [f"{destination_dir}/{filename}.mmrs"]
+
+    if USE_FAST_STANDALONE:
+        return convert_standalone_in_memory(filepath, filename, destination_dir)
 
     # Begin conversion
     with tempfile.TemporaryDirectory(prefix='zseq_convert_') as tempfolder:
-        standalone_seq = StandaloneSequence(filename, tempfolder)
+        with conversion_stage('parse'):
+            standalone_seq = StandaloneSequence(filename, tempfolder)
 
-        try:
+        with conversion_stage('read'):
             standalone_seq.copy(filepath)
 
-            cosmetic_name = clean_cosmetic_name(standalone_seq.filename)
-            instrument_set = standalone_seq.instrument_set
+        with conversion_stage('parse'):
+            cosmetic_name, instrument_set, categories, song_type = parse_standalone(standalone_seq, filename)
 
-            # 0x28 and higher indicate a custom instrument bank
-            try:
-                if instrument_set > 0x27:
-                    raise ValueError(
-                        f'ERROR: Error processing zseq file: {filename}.zseq! Instrument bank outside valid values!')
-            except Exception as e:
-                raise Exception(e)
+        # Write the metadata and pack the file
+        with conversion_stage('metadata'):
+            write_metadata(standalone_seq.tempfolder, standalone_seq.filename, cosmetic_name, instrument_set, song_type, categories)
 
-            categories = parse_categories(standalone_seq.categories)
-            song_type = get_song_type(categories, filename)
+        with conversion_stage('pack'):
+            mmrs_path = pack(standalone_seq.filename, standalone_seq.tempfolder, destination_dir)
 
-            # Write the metadata and pack the file
-            write_metadata(standalone_seq.tempfolder, standalone_seq.filename, cosmetic_name, instrument_set, song_type, categories)
-            pack(standalone_seq.filename, standalone_seq.tempfolder, destination_dir)
+    return [mmrs_path]
 
-        except Exception as e:
-            raise Exception(e)
 
+def get_zsound_links(archive_zsounds: dict[str, int], bankmeta_data: bytes | memoryview, zbank_data: bytes | memoryview) -> dict[str, dict]:
+    ''' Links each .zsound file to the instrument, drum, or sound effect in the bank that uses its sample '''
+    zsounds: dict = {}
+
+    # Audiobank slices the bank many times, which memoryviews do without copying, and views from mapped_view are used as they are
+    audiobank: Audiobank = Audiobank(
+        bankmeta_data if isinstance(bankmeta_data, memoryview) else memoryview(bankmeta_data),
+        zbank_data if isinstance(zbank_data, memoryview) else memoryview(zbank_data),
+    )
+
+    for key, value in archive_zsounds.items():
+        if key and value:
+            for sample in audiobank.get_bank_samples():
+                if value == sample.address:
+                    zsounds[key] = {
+                        "instrument type": sample.parent_type,
+                        "list index": sample.parent_index
+                    }
+
+                    if isinstance(sample.parent, Instrument):
+                        zsounds[key]["key region"] = sample.key_region
 
-def process_archive_sequences(archive: MusicArchive, destination_dir: str, filename: str, cosmetic_name: str, categories: list, song_type: str, original_temp: str):
+                    break
+
+    return zsounds
+
+
+def process_archive_sequences(archive: MusicArchive, destination_dir: str, filename: str, cosmetic_name: str, categories: list, song_type: str, original_temp: str) -> list[str]:
     ''' Processes each sequence in an .mmrs file due to the old format allowing multiple '''
     zsounds: dict = {}
     formmask = None
+    mmrs_paths: list[str] = []
 
     for base_name, ext in archive.sequences:
         with tempfile.TemporaryDirectory(prefix='mmrs_convert_2_') as song_folder:
-            instrument_set = int(base_name, 16)
+            with conversion_stage('parse'):
+                instrument_set = int(base_name, 16)
 
-            original_sequence = os.path.join(original_temp, f'{base_name}{ext}')
-            new_sequence_path = os.path.join(song_folder, f'{base_name}.seq')
-            shutil.copyfile(original_sequence, new_sequence_path)
+            with conversion_stage('read'):
+                original_sequence = os.path.join(original_temp, f'{base_name}{ext}')
+                new_sequence_path = os.path.join(song_folder, f'{base_name}.seq')
+                shutil.copyfile(original_sequence, new_sequence_path)
 
             if base_name in archive.banks:
                 bank, bankmeta = archive.banks[base_name]
 
-                shutil.copyfile(os.path.join(original_temp, bank), os.path.join(song_folder, bank))
-                shutil.copyfile(os.path.join(original_temp, bankmeta), os.path.join(song_folder, bankmeta))
+                with conversion_stage('read'):
+                    shutil.copyfile(os.path.join(original_temp, bank), os.path.join(song_folder, bank))
+                    shutil.copyfile(os.path.join(original_temp, bankmeta), os.path.join(song_folder, bankmeta))
 
-                instrument_set = 'custom'
+                    for item in os.listdir(original_temp):
+                        if item.lower().endswith(".zsound"):
+                            shutil.copyfile(os.path.join(
+                                original_temp, item), os.path.join(song_folder, item))
 
-                for item in os.listdir(original_temp):
-                    if item.endswith(".zsound"):
-                        shutil.copyfile(os.path.join(
-                            original_temp, item), os.path.join(song_folder, item))
+                instrument_set = 'custom'
 
                 # Get new sample links
                 if USE_NEW_LINKING and bank and bankmeta:
-                    with open(os.path.join(original_temp, bankmeta), 'rb') as bmeta:
-                        bankmeta_data = bmeta.read()
-
-                    with open(os.path.join(original_temp, bank), 'rb') as zbank:
-                        zbank_data = zbank.read()
-
-                    audiobank: Audiobank = Audiobank(bankmeta_data, zbank_data)
-
-                    for key, value in archive.zsounds.items():
-                        if key and value:
-                            for sample in audiobank.get_bank_samples():
-                                if value == sample.address:
-                                    zsounds[key] = {
-                                        "instrument type": sample.parent_type,
-                                        "list index": sample.parent_index
-                                    }
-
-                                    if isinstance(sample.parent, Instrument):
-                                        zsounds[key]["key region"] = sample.key_region
-
-                                    break
+                    with conversion_stage('parse'):
+                        with mapped_view(os.path.join(original_temp, bankmeta)) as bankmeta_data, \
+                             mapped_view(os.path.join(original_temp, bank)) as zbank_data:
+                            zsounds.update(get_zsound_links(archive.zsounds, bankmeta_data, zbank_data))
 
                 else:
                     for key, value in archive.zsounds.items():
@@ -530,24 +1202,98 @@ def process_archive_sequences(archive: MusicArchive, destination_dir: str, filen
 
             if base_name in archive.formmasks:
                 formmask_path = os.path.join(original_temp, archive.formmasks[base_name])
-                try:
+                with conversion_stage('parse'):
                     with open(formmask_path, 'r', encoding='utf-8') as f:
                         formmask = yaml.safe_load(f)
-                except Exception as e:
-                    raise Exception(e)
 
-            copy_unprocessed_files(original_temp, song_folder)
+            with conversion_stage('read'):
+                copy_unprocessed_files(original_temp, song_folder)
+
+            with conversion_stage('metadata'):
+                write_metadata( song_folder, base_name, cosmetic_name, instrument_set, song_type, categories, zsounds if zsounds else None, formmask if formmask else None)
+
+            with conversion_stage('pack'):
+                if len(archive.sequences) > 1:
+                    mmrs_paths.append(pack(f'{filename}_{base_name}', song_folder, destination_dir))
+                else:
+                    mmrs_paths.append(pack(f'{filename}', song_folder, destination_dir))
+
+    return mmrs_paths
+
+
+def process_archive_sequences_in_memory(archive: MusicArchive, filename: str, cosmetic_name: str, categories: list, song_type: str) -> list[tuple[str, bytes]]:
+    ''' Processes each sequence in an .mmrs file loaded into memory, returning the name and data of each new .mmrs file '''
+    zsounds: dict = {}
+    formmask = None
+    outputs: list[tuple[str, bytes]] = []
 
-            write_metadata( song_folder, base_name, cosmetic_name, instrument_set, song_type, categories, zsounds if zsounds else None, formmask if formmask else None)
+    zsound_files = [f for f in archive.files if f.lower().endswith(".zsound")]
+    unprocessed_files = [f for f in archive.files if not is_processed_file(f)]
 
+    for base_name, ext in archive.sequences:
+        with conversion_stage('parse'):
+            instrument_set = int(base_name, 16)
+
+        with conversion_stage('read'):
+            members: list[tuple[str, bytes | memoryview]] = [(f'{base_name}.seq', archive.files[f'{base_name}{ext}'])]
+
+        if base_name in archive.banks:
+            bank, bankmeta = archive.banks[base_name]
+
+            with conversion_stage('read'):
+                members.append((bank, archive.files[bank]))
+                members.append((bankmeta, archive.files[bankmeta]))
+                members.extend((f, archive.files[f]) for f in zsound_files)
+
+            instrument_set = 'custom'
+
+            # Get new sample links
+            if USE_NEW_LINKING and bank and bankmeta:
+                with conversion_stage('parse'):
+                    zsounds.update(get_zsound_links(archive.zsounds, archive.files[bankmeta], archive.files[bank]))
+
+            else:
+                for key, value in archive.zsounds.items():
+                    if key and value:
+                        zsounds[f"{key}.zsound"] = {"temp address": value}
+
+        if base_name in archive.formmasks:
+            with conversion_stage('parse'):
+                formmask = yaml.safe_load(str(archive.files[archive.formmasks[base_name]], 'utf-8'))
+
+        with conversion_stage('read'):
+            members.extend((f, archive.files[f]) for f in unprocessed_files)
+
+        with conversion_stage('metadata'):
+            metadata = create_metadata(cosmetic_name, instrument_set, song_type, categories, zsounds if zsounds else None, formmask if formmask else None)
+            members.append((f'{base_name}.metadata', metadata.encode('utf-8')))
+
+        with conversion_stage('pack'):
             if len(archive.sequences) > 1:
-                pack(f'{filename}_{base_name}', song_folder, destination_dir)
+                outputs.append((f'{filename}_{base_name}', build_archive(members)))
             else:
-                pack(f'{filename}', song_folder, destination_dir)
+                outputs.append((f'{filename}', build_archive(members)))
+
+    return outputs
+
+
+def transform_archive(data: MappedFile | bytes, filename: str) -> list[tuple[str, bytes]]:
+    ''' Converts the data of an .mmrs file in memory, returning the name and data of each new .mmrs file '''
+    archive = MusicArchive()
+
+    with conversion_stage('read'):
+        archive.load(data, filename)
 
+    with conversion_stage('parse'):
+        cosmetic_name: str = clean_cosmetic_name(filename)
+        raw_categories = str(archive.files[archive.categories], 'utf-8').splitlines()
+        categories, song_type = parse_categories_text(raw_categories[0].strip() if raw_categories else '', filename)
 
-def convert_archive(input_file: str, destination_dir: str):
-    ''' Converts an .mmrs file into the YAML metadata .mmrs format '''
+    return process_archive_sequences_in_memory(archive, filename, cosmetic_name, categories, song_type)
+
+
+def convert_archive(input_file: str, destination_dir: str) -> list[str]:
+    ''' Converts an .mmrs file into the YAML metadata .mmrs format, returning the converted file paths '''
     filename = os.path.splitext(os.path.basename(input_file))[0]
     filepath = os.path.abspath(input_file)
 
@@ -556,22 +1302,22 @@ def convert_archive(input_file: str, destination_dir: str):
         original_temp = archive.tempfolder
 
         try:
-            archive.unpack(filepath)
+            with conversion_stage('read'):
+                archive.unpack(filepath)
 
-            cosmetic_name: str = clean_cosmetic_name(filename)
-            categories_path: str = os.path.join(original_temp, archive.categories)
-            categories, song_type = parse_categories_and_song_type(categories_path, filename)
+            with conversion_stage('parse'):
+                cosmetic_name: str = clean_cosmetic_name(filename)
+                categories_path: str = os.path.join(original_temp, archive.categories)
+                categories, song_type = parse_categories_and_song_type(categories_path, filename)
 
-            process_archive_sequences(archive, destination_dir, filename, cosmetic_name, categories, song_type, original_temp)
+            return process_archive_sequences(archive, destination_dir, filename, cosmetic_name, categories, song_type, original_temp)
 
         except SkipFileException:
-            return
-        except Exception as e:
-            raise Exception(e)
+            return []
 
 
-def processing_file(input_file: str, base_folder: str, conversion_folder: str) -> None:
-    ''' Processes a single file '''
+def processing_file(input_file: str, base_folder: str, conversion_folder: str) -> list[str]:
+    ''' Processes a single file, returning the converted file paths '''
     try:
         extension = os.path.splitext(input_file)[1]
         relative_path = os.path.relpath(input_file, base_folder)
@@ -582,35 +1328,575 @@ def processing_file(input_file: str, base_folder: str, conversion_folder: str) -
         os.makedirs(destination_dir, exist_ok=True)
 
         if extension == ".zseq":
-            convert_standalone(input_file, destination_dir)
+            return convert_standalone(input_file, destination_dir)
 
         elif extension == ".mmrs":
-            convert_archive(input_file, destination_dir)
+            return convert_archive(input_file, destination_dir)
 
+        return []
+
+    except ConversionError as e:
+        raise ConversionError(e.stage, f"processing_file Error: {e}") from e
     except Exception as e:
-        raise Exception(f"processing_file Error: {e}")
+        raise ConversionError('prepare', f"processing_file Error: {e}") from e
+
+
+def is_music_file(filepath: str) -> bool:
+    ''' Checks if a file is an old format music file that can be converted '''
+    return os.path.splitext(filepath)[1] in ('.zseq', '.mmrs')
+
+
+def to_manifest_path(path: str, start: str) -> str:
+    ''' Gets a path relative to start with forward slashes, so manifests are portable '''
+    return os.path.relpath(path, start).replace(os.sep, '/')
+
+
+def from_manifest_path(path: str, start: str) -> str:
+    ''' Gets the full path of a manifest path relative to start '''
+    return os.path.join(start, *path.split('/'))
+
+
+def in_shard(rel_path: str, shard: tuple[int, int]) -> bool:
+    ''' Checks if a file belongs to a shard using a stable hash of its relative path '''
+    index, count = shard
+    digest = hashlib.sha1(rel_path.encode('utf-8')).digest()
+
+    return int.from_bytes(digest[:8], 'big') % count == index
+
+
+def get_manifest_name(shard: tuple[int, int] = None) -> str:
+    ''' Gets the filename of the full manifest, or of a shard's partial manifest '''
+    if shard is None:
+        return MANIFEST_NAME
+
+    index, count = shard
+    return f'.mmrs-manifest.shard-{index}-of-{count}.json'
+
+
+def load_manifest(conversion_folder: str, manifest_name: str = MANIFEST_NAME) -> dict | None:
+    ''' Loads the manifest of a conversion folder, or None if it does not have one '''
+    manifest_path = os.path.join(conversion_folder, manifest_name)
+    if not os.path.isfile(manifest_path):
+        return None
+
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_manifest(conversion_folder: str, manifest: dict, manifest_name: str = MANIFEST_NAME) -> None:
+    ''' Writes a manifest into the conversion folder with its files sorted '''
+    manifest["files"] = dict(sorted(manifest["files"].items()))
+    if "assigned" in manifest:
+        manifest["assigned"] = sorted(manifest["assigned"])
+
+    with open(os.path.join(conversion_folder, manifest_name), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
 
 
-def process_with_spinner(input_file: str, base_folder: str, conversion_folder: str, show_file_log: bool = False) -> None:
+def update_manifest(base_folder: str, conversion_folder: str, converted: dict[str, list[str]], failed: list[str], files: list[str], shard: tuple[int, int] = None, inputs_only: bool = False) -> None:
+    ''' Records which converted files were created from each source file in the conversion folder's manifest '''
+    manifest_name = get_manifest_name(shard)
+    manifest = load_manifest(conversion_folder, manifest_name)
+    if manifest is None or manifest.get("source root") != os.path.abspath(base_folder):
+        manifest = {"source root": os.path.abspath(base_folder), "files": {}}
+
+    for input_file, mmrs_paths in converted.items():
+        manifest["files"][to_manifest_path(input_file, base_folder)] = sorted(
+            to_manifest_path(mmrs_path, conversion_folder) for mmrs_path in mmrs_paths
+        )
+
+    # A file that failed this run is no longer converted, even if an earlier run converted it
+    for input_file in failed:
+        manifest["files"].pop(to_manifest_path(input_file, base_folder), None)
+
+    # A run on individual files only covers those files, so verifying should not expect the rest of their folder to be converted
+    if inputs_only:
+        manifest["inputs"] = sorted(set(manifest.get("inputs", [])) | {
+            to_manifest_path(input_file, base_folder) for input_file in files if is_music_file(input_file)
+        })
+    else:
+        manifest.pop("inputs", None)
+
+    # Partial manifests also record every file the shard was assigned, so merging can tell failures from gaps
+    if shard is not None:
+        manifest["shard"] = f"{shard[0]}/{shard[1]}"
+        manifest["assigned"] = list(set(manifest.get("assigned", [])) | {
+            to_manifest_path(input_file, base_folder) for input_file in files if is_music_file(input_file)
+        })
+
+    write_manifest(conversion_folder, manifest, manifest_name)
+
+
+def list_source_files(source_root: str) -> list[str]:
+    ''' Lists the manifest path of every music file in a source folder or bundle '''
+    if os.path.isfile(source_root) and is_bundle(source_root):
+        return MusicBundle(source_root).names()
+
+    return [
+        to_manifest_path(os.path.join(root, name), source_root)
+        for root, _, files in os.walk(source_root)
+        for name in files
+        if is_music_file(name)
+    ]
+
+
+def merge_shards(conversion_folder: str) -> list[str]:
+    ''' Merges the partial manifests of every shard into the full manifest, returning any overlaps or gaps found '''
+    partial_names = sorted(
+        name for name in os.listdir(conversion_folder)
+        if name.startswith('.mmrs-manifest.shard-') and name.endswith('.json')
+    )
+    if not partial_names:
+        return [f"No shard manifests found in {conversion_folder}"]
+
+    problems: list[str] = []
+    manifest: dict = {"files": {}}
+    owners: dict[str, list[str]] = defaultdict(list)
+    shards: set[str] = set()
+    shard_count: int = None
+
+    for name in partial_names:
+        partial = load_manifest(conversion_folder, name)
+        index, count = (int(part) for part in partial["shard"].split('/'))
+
+        if shard_count is not None and count != shard_count:
+            problems.append(f"Shard {partial['shard']} does not match the shard count of {shard_count}")
+        shard_count = shard_count or count
+        shards.add(partial["shard"])
+
+        # Shards on machines that mount the source at different paths can't be checked against one source folder
+        manifest.setdefault("source root", partial["source root"])
+        if partial["source root"] != manifest["source root"]:
+            problems.append(f"Shard {partial['shard']} has a different source root: {partial['source root']} (expected {manifest['source root']})")
+
+        manifest["files"].update(partial["files"])
+        if "inputs" in partial:
+            manifest["inputs"] = sorted(set(manifest.get("inputs", [])) | set(partial["inputs"]))
+
+        for source in partial["assigned"]:
+            owners[source].append(partial["shard"])
+
+            # Assigned files missing from the shard's converted files failed there, and would otherwise vanish from the merge
+            if source not in partial["files"]:
+                problems.append(f"{source} was assigned to shard {partial['shard']} but failed to convert")
+
+    for index in range(shard_count):
+        if f"{index}/{shard_count}" not in shards:
+            problems.append(f"Missing manifest for shard {index}/{shard_count}")
+
+    for source, shard_names in sorted(owners.items()):
+        if len(shard_names) > 1:
+            problems.append(f"{source} was converted by more than one shard: {', '.join(shard_names)}")
+
+    # Every music file in the source folder or bundle, or every input file, should have been assigned to a shard
+    if "inputs" not in manifest and not os.path.exists(manifest["source root"]):
+        problems.append(f"Source root {manifest['source root']} was not found, so files not assigned to any shard could not be checked")
+
+    for source in manifest.get("inputs") or list_source_files(manifest["source root"]):
+        if source not in owners:
+            problems.append(f"{source} was not assigned to any shard")
+
+    write_manifest(conversion_folder, manifest)
+
+    return problems
+
+
+def report_failure(input_file: str, error: ConversionError) -> None:
+    ''' Prints and logs a file that failed to convert '''
     global spinner_thread
+    # Stop processing and log exceptions
+    done_flag.set()
+    spinner_thread.join()
+    print(f"{RED}Error processing {input_file}:{RESET}")
+    print(f"{YELLOW}{str(error)}{RESET}")
+    print()
+    log_error(f"Error processing {input_file}", exc_info=error, input_file=input_file, stage=error.stage, reason=str(error.__cause__ or error))
+    # Restart processing
+    spinner_thread = start_spinner("Processing file...")
+
+
+def process_with_spinner(input_file: str, base_folder: str, conversion_folder: str, show_file_log: bool = False) -> list[str] | None:
+    ''' Processes a single file, returning the converted file paths or None if it failed '''
     try:
-        processing_file(input_file, base_folder, conversion_folder)
-    except Exception as e:
-        # Stop processing and log exceptions
-        done_flag.set()
-        spinner_thread.join()
-        print(f"{RED}Error processing {input_file}:{RESET}")
-        print(f"{YELLOW}{str(e)}{RESET}")
-        print()
-        log_error(f"Error processing {input_file}", exc_info=True)
-        # Restart processing
-        spinner_thread = start_spinner("Processing file...")
+        return processing_file(input_file, base_folder, conversion_folder)
+    except ConversionError as e:
+        report_failure(input_file, e)
+        return None
+
 
+class ConversionJob:
+    ''' Represents a file moving through the stages of the conversion pipeline '''
 
-def process_files(base_folder: str, conversion_folder: str, files: list[str], show_file_log: bool = False):
-    ''' Processes files with the spinner '''
+    def __init__(self, input_file: str, base_folder: str, conversion_folder: str, data: bytes = None) -> None:
+        self.input_file = input_file
+        self.filename, self.extension = os.path.splitext(os.path.basename(input_file))
+        self.destination_dir = os.path.dirname(os.path.join(conversion_folder, os.path.relpath(input_file, base_folder)))
+
+        self.data: MappedFile | bytes = data
+        self.outputs: list[tuple[str, bytes]] = []
+        self.mmrs_paths: list[str] = None
+        self.error: ConversionError = None
+
+
+def read_stage(job: ConversionJob) -> None:
+    ''' Reads a source file from disk, so the transform stage never waits on it '''
+    with conversion_stage('prepare'):
+        os.makedirs(job.destination_dir, exist_ok=True)
+
+    if not is_music_file(job.input_file):
+        job.mmrs_paths = []
+        return
+
+    # If the file already exists, skip it
+    existing_path = f"{job.destination_dir}/{job.filename}.mmrs"
+    if job.extension == '.zseq' and os.path.isfile(existing_path):
+        count_write('skipped')
+        job.mmrs_paths = [existing_path]
+        job.data = None
+        return
+
+    # Files from a bundle are already read while streaming it
+    if job.data is not None:
+        return
+
+    with conversion_stage('read'):
+        # Stored members are used straight from the mapping, so its pages are read here instead of by the transform stage
+        job.data = map_input(job.input_file)
+        if isinstance(job.data, MappedFile):
+            job.data.prefault()
+
+
+def transform_stage(job: ConversionJob) -> None:
+    ''' Converts a source file's data into the data of its new .mmrs files '''
+    if job.mmrs_paths is not None:
+        return
+
+    try:
+        if job.extension == '.zseq':
+            with memoryview(job.data) as sequence_data:
+                job.outputs = transform_standalone(sequence_data, job.filename)
+        else:
+            job.outputs = transform_archive(job.data, job.filename)
+
+    except SkipFileException:
+        job.mmrs_paths = []
+
+    finally:
+        # A traceback can still hold views of the mapping, which is then closed once they are freed
+        if isinstance(job.data, MappedFile):
+            try:
+                job.data.close()
+            except BufferError:
+                pass
+        job.data = None
+
+
+def write_stage(job: ConversionJob) -> None:
+    ''' Writes the new .mmrs files to disk '''
+    if job.mmrs_paths is not None:
+        return
+
+    with conversion_stage('pack'):
+        job.mmrs_paths = [write_archive(name, data, job.destination_dir) for name, data in job.outputs]
+
+    job.outputs = []
+
+
+class ConversionPipeline:
+    ''' Converts files in read, transform, and write stages that run at the same time, connected by bounded queues '''
+
+    def __init__(self, worker_counts: list[int], queue_size: int) -> None:
+        self.stages = [read_stage, transform_stage, write_stage]
+        self.worker_counts = list(worker_counts)
+        self.queue_size = queue_size
+
+        self.queues: list[queue.Queue] = []
+        self.threads: list[list[threading.Thread]] = [[] for _ in self.stages]
+        self.lock = threading.Lock()
+
+        # Sampled by the autotuner, along with the part of that time each stage's threads spent off the CPU waiting on I/O
+        self.busy_times: list[float] = [0.0 for _ in self.stages]
+        self.io_wait_times: list[float] = [0.0 for _ in self.stages]
+        self.completed_count: int = 0
+
+    def work(self, stage_index: int) -> None:
+        ''' Runs a stage on every job in its input queue until it receives None, or the stage has too many workers '''
+        stage = self.stages[stage_index]
+        input_queue, output_queue = self.queues[stage_index], self.queues[stage_index + 1]
+
+        with profile_worker():
+            while (job := input_queue.get()) is not None:
+                start = time.perf_counter()
+                start_cpu = time.thread_time()
+
+                if job.error is None:
+                    try:
+                        stage(job)
+                    except ConversionError as e:
+                        job.error = e
+                    except Exception as e:
+                        job.error = ConversionError('unknown', e)
+                        job.error.__cause__ = e
+
+                # Time spent blocked on a full output queue is backpressure from the next stage, not work in this one
+                busy_time = time.perf_counter() - start
+                io_wait_time = max(0.0, busy_time - (time.thread_time() - start_cpu))
+                output_queue.put(job)
+
+                with self.lock:
+                    self.busy_times[stage_index] += busy_time
+                    self.io_wait_times[stage_index] += io_wait_time
+                    if stage_index == len(self.stages) - 1:
+                        self.completed_count += 1
+
+                    # Retire this worker if the stage has been shrunk
+                    if len(self.threads[stage_index]) > self.worker_counts[stage_index]:
+                        self.threads[stage_index].remove(threading.current_thread())
+                        return
+
+    def add_workers(self, stage_index: int, count: int) -> None:
+        ''' Starts more workers for a stage, must be called with the lock held '''
+        for _ in range(count):
+            thread = threading.Thread(target=self.work, args=(stage_index,), daemon=True)
+            self.threads[stage_index].append(thread)
+            thread.start()
+
+    def resize(self, stage_index: int, worker_count: int) -> None:
+        ''' Changes the number of workers for a stage, extra workers retire after their current job '''
+        with self.lock:
+            self.worker_counts[stage_index] = worker_count
+            if worker_count > len(self.threads[stage_index]):
+                self.add_workers(stage_index, worker_count - len(self.threads[stage_index]))
+
+    def run(self, jobs: Iterable[ConversionJob], autotune: bool = False) -> list[ConversionJob]:
+        ''' Runs every job through the pipeline as they are created, returning the finished jobs '''
+        # The bounded queues block the stage before them when full, so only a limited number of files are in memory
+        self.queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        self.queues.append(queue.SimpleQueue())
+
+        with self.lock:
+            for i, worker_count in enumerate(self.worker_counts):
+                self.add_workers(i, worker_count)
+
+        autotuner = PipelineAutotuner(self) if autotune else None
+        if autotuner is not None:
+            autotuner.start()
+
+        try:
+            for job in jobs:
+                self.queues[0].put(job)
+        finally:
+            if autotuner is not None:
+                autotuner.stop()
+
+            # Stop each stage once the stage before it has finished, even if creating the jobs failed
+            for i in range(len(self.stages)):
+                with self.lock:
+                    threads = list(self.threads[i])
+                for _ in threads:
+                    self.queues[i].put(None)
+                for thread in threads:
+                    thread.join()
+
+        finished: list[ConversionJob] = []
+        while not self.queues[-1].empty():
+            finished.append(self.queues[-1].get())
+
+        return finished
+
+
+class PipelineAutotuner:
+    ''' Grows or shrinks the worker count of each pipeline stage while it runs, based on throughput, CPU use, and how busy each stage is '''
+
+    def __init__(self, pipeline: ConversionPipeline) -> None:
+        self.pipeline = pipeline
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+        # A stage is not grown past a worker count that made the pipeline slower
+        self.max_counts: list[int] = [AUTOTUNE_MAX_WORKERS for _ in pipeline.stages]
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.thread.join()
+
+    def sample(self) -> tuple[float, float, int, list[float], list[float]]:
+        ''' Gets the time, process CPU time, completed jobs, and busy time and I/O wait time of each stage '''
+        with self.pipeline.lock:
+            return (time.perf_counter(), time.process_time(), self.pipeline.completed_count,
+                    list(self.pipeline.busy_times), list(self.pipeline.io_wait_times))
+
+    @staticmethod
+    def cpu_ceiling() -> float:
+        ''' Gets the most cores the pipeline's Python code can use, which is one unless the GIL is disabled '''
+        is_gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)
+        return 1.0 if is_gil_enabled() else float(os.cpu_count() or 1)
+
+    def choose_change(self, utilizations: list[float], stage_cpu_uses: list[float], cpu_use: float) -> tuple[int, int] | None:
+        ''' Picks a stage to grow or shrink by one worker, or None to leave the pipeline as it is '''
+        counts = self.pipeline.worker_counts
+        busiest = max(range(len(counts)), key=lambda i: utilizations[i])
+        idlest = min(range(len(counts)), key=lambda i: utilizations[i])
+
+        # YAML and zip work holds the GIL, so once it uses a whole core only a stage that is mostly waiting on I/O can gain from more workers
+        cpu_bound = cpu_use >= 0.9 * self.cpu_ceiling() and stage_cpu_uses[busiest] >= 0.5 * cpu_use
+
+        if utilizations[busiest] > 0.8 and counts[busiest] < self.max_counts[busiest] and not cpu_bound:
+            return busiest, 1
+
+        if utilizations[idlest] < 0.2 and counts[idlest] > 1:
+            return idlest, -1
+
+        return None
+
+    def run(self) -> None:
+        last_sample = self.sample()
+        last_throughput: float = None
+        last_change: tuple[int, int] = None
+
+        while not self.stopped.wait(AUTOTUNE_INTERVAL):
+            sample = self.sample()
+            elapsed = sample[0] - last_sample[0]
+            counts = list(self.pipeline.worker_counts)
+
+            throughput = (sample[2] - last_sample[2]) / elapsed
+            cpu_use = (sample[1] - last_sample[1]) / elapsed
+            utilizations = [
+                (busy - last_busy) / (elapsed * count)
+                for busy, last_busy, count in zip(sample[3], last_sample[3], counts)
+            ]
+            # The CPU each stage used is its busy time minus its I/O wait, which is measured as CPU and not a share of busy time
+            # because waiting for the GIL is also time off the CPU
+            stage_cpu_uses = [
+                ((busy - last_busy) - (io_wait - last_io_wait)) / elapsed
+                for busy, last_busy, io_wait, last_io_wait in zip(sample[3], last_sample[3], sample[4], last_sample[4])
+            ]
+            last_sample = sample
+
+            # Undo the last change if it made the pipeline slower, or if a new worker did not make it meaningfully faster
+            if last_change is not None and throughput < last_throughput * (1 + AUTOTUNE_MIN_GAIN if last_change[1] > 0 else 1 - AUTOTUNE_MIN_GAIN):
+                stage_index, delta = last_change
+                if delta > 0:
+                    self.max_counts[stage_index] = counts[stage_index] - delta
+                self.pipeline.resize(stage_index, counts[stage_index] - delta)
+                last_change = None
+
+            else:
+                last_change = self.choose_change(utilizations, stage_cpu_uses, cpu_use)
+                if last_change is not None:
+                    stage_index, delta = last_change
+                    self.pipeline.resize(stage_index, counts[stage_index] + delta)
+
+            last_throughput = throughput
+
+
+def process_files_threaded(base_folder: str, conversion_folder: str, files: list[str], show_file_log: bool = False) -> dict[str, list[str]]:
+    ''' Processes each file in a thread pool, returning the converted file paths of each file or None if it failed '''
+    futures = {}
+    with ThreadPoolExecutor() as executor:
+        for input_file in files:
+            future = executor.submit(call_profiled, process_with_spinner, input_file, base_folder, conversion_folder, show_file_log)
+            futures[future] = input_file
+
+    results: dict[str, list[str]] = {}
+    for future, input_file in futures.items():
+        try:
+            results[input_file] = future.result()
+        except Exception as e:
+            results[input_file] = None
+            log_error(f"Error processing {input_file}", exc_info=e, input_file=input_file, stage='unknown', reason=str(e))
+
+    return results
+
+
+def run_pipeline(jobs: Iterable[ConversionJob]) -> dict[str, list[str]]:
+    ''' Runs jobs through the conversion pipeline, returning the converted file paths of each file or None if it failed '''
+    global pipeline_workers
+    pipeline = ConversionPipeline(pipeline_workers, PIPELINE_QUEUE_SIZE)
+    jobs = pipeline.run(jobs, autotune=use_autotune)
+
+    # Later folders start from the worker counts this one settled on
+    pipeline_workers = pipeline.worker_counts
+
+    results: dict[str, list[str]] = {}
+    for job in jobs:
+        if job.error is not None:
+            report_failure(job.input_file, job.error)
+
+        results[job.input_file] = job.mmrs_paths if job.error is None else None
+
+    return results
+
+
+def process_files_pipelined(base_folder: str, conversion_folder: str, files: list[str]) -> dict[str, list[str]]:
+    ''' Processes files through the conversion pipeline, returning the converted file paths of each file or None if it failed '''
+    return run_pipeline(ConversionJob(input_file, base_folder, conversion_folder) for input_file in files)
+
+
+def record_results(base_folder: str, conversion_folder: str, results: dict[str, list[str]], files: list[str], shard: tuple[int, int] = None, inputs_only: bool = False) -> int:
+    ''' Adds the converted files to the manifest, returning the number of files that failed '''
+    failed: list[str] = []
+    converted: dict[str, list[str]] = {}
+    for input_file, mmrs_paths in results.items():
+        if mmrs_paths is None:
+            failed.append(input_file)
+        elif is_music_file(input_file):
+            converted[input_file] = mmrs_paths
+
+    update_manifest(base_folder, conversion_folder, converted, failed, files, shard, inputs_only)
+
+    return len(failed)
+
+
+def process_bundle(bundle_path: str, conversion_folder: str, shard: tuple[int, int] = None) -> int:
+    ''' Processes the music files in a .zip or .tar bundle without extracting it, returning the number of files that failed '''
     os.makedirs(conversion_folder, exist_ok=True)
 
+    bundle = MusicBundle(bundle_path)
+    assigned: list[str] = []
+    bundle_failed_count = 0
+
+    def create_jobs() -> Iterator[ConversionJob]:
+        nonlocal bundle_failed_count
+        try:
+            for name, member_path, data in bundle.members():
+                if member_path is None:
+                    bundle_failed_count += 1
+                    report_failure(f"{bundle_path}:{name}", ConversionError('prepare', f"Bundle member points outside the bundle: {name}"))
+                    continue
+
+                # Only keep the files in this shard, so multiple machines can convert the same bundle
+                if shard is not None and not in_shard(member_path, shard):
+                    continue
+
+                # Bundle members use the bundle as their base folder, so their relative paths are kept in the output
+                input_file = from_manifest_path(member_path, bundle_path)
+                assigned.append(input_file)
+                yield ConversionJob(input_file, bundle_path, conversion_folder, data)
+
+        # A corrupt or truncated bundle stops here, but the files already read from it are still converted
+        except Exception as e:
+            bundle_failed_count += 1
+            error = ConversionError('read', e)
+            error.__cause__ = e
+            report_failure(bundle_path, error)
+
+    results = run_pipeline(create_jobs())
+
+    return record_results(bundle_path, conversion_folder, results, assigned, shard) + bundle_failed_count
+
+
+def process_files(base_folder: str, conversion_folder: str, files: list[str], show_file_log: bool = False, shard: tuple[int, int] = None, inputs_only: bool = False) -> int:
+    ''' Processes files with the spinner, returning the number of files that failed '''
+    os.makedirs(conversion_folder, exist_ok=True)
+
+    # Only keep the files in this shard, so multiple machines can convert the same folder
+    if shard is not None:
+        files = [input_file for input_file in files if in_shard(to_manifest_path(input_file, base_folder), shard)]
+
     # Store each file and its relative path
     files_by_dir = defaultdict(list)
     for input_file in files:
@@ -618,27 +1904,36 @@ def process_files(base_folder: str, conversion_folder: str, files: list[str], sh
         dir_path = os.path.dirname(rel_path)
         files_by_dir[dir_path].append((input_file, os.path.basename(rel_path)))
 
-    with ThreadPoolExecutor() as executor:
-        # Process files by directory
-        for dir_path, file_entries in sorted(files_by_dir.items()):
-            if not USE_SPINNER and show_file_log:
-                print(f"{CYAN}Processing Directory:{RESET} {os.path.join(os.path.basename(base_folder), dir_path)}")
+    # Process files by directory
+    ordered_files: list[str] = []
+    for dir_path, file_entries in sorted(files_by_dir.items()):
+        if not USE_SPINNER and show_file_log:
+            print(f"{CYAN}Processing Directory:{RESET} {os.path.join(os.path.basename(base_folder), dir_path)}")
 
-                for _, filename in sorted(file_entries, key=lambda x: x[1]):
-                    print(f"{GRAY_248}  └─ Processing file:{RESET} {filename}")
+            for _, filename in sorted(file_entries, key=lambda x: x[1]):
+                print(f"{GRAY_248}  └─ Processing file:{RESET} {filename}")
 
-            for input_file, _, in file_entries:
-                executor.submit(process_with_spinner, input_file, base_folder, conversion_folder, show_file_log)
+        ordered_files.extend(input_file for input_file, _ in file_entries)
+
+    if USE_PIPELINE:
+        results = process_files_pipelined(base_folder, conversion_folder, ordered_files)
+    else:
+        results = process_files_threaded(base_folder, conversion_folder, ordered_files, show_file_log)
 
+    return record_results(base_folder, conversion_folder, results, files, shard, inputs_only)
 
-def convert_music_files() -> None:
-    ''' Main function to process files and convert them from the old format to the new format '''
+
+def convert_music_files(files: list[str], shard: tuple[int, int] = None) -> int:
+    ''' Main function to process files and convert them from the old format to the new format, returning the number of failed files '''
     global spinner_thread
 
+    start_error_logging()
     spinner_thread = start_spinner("Processing files...")
+    failed_count = 0
+    write_counts.update(written=0, unchanged=0, skipped=0)
 
     try:
-        for file in FILES:
+        for file in files:
             filepath = os.path.abspath(file)
 
             # If the file is a directory, process the directory and all subdirectories
@@ -657,7 +1952,16 @@ def convert_music_files() -> None:
                 if not USE_SPINNER:
                     print(f"{CYAN}Processing directory:{RESET} {os.path.basename(base_folder)}")
 
-                process_files(base_folder, conversion_folder, files_to_process, True)
+                failed_count += process_files(base_folder, conversion_folder, files_to_process, True, shard)
+
+            # If the file is a bundle, process every music file inside it without extracting it
+            elif os.path.isfile(file) and is_bundle(file):
+                conversion_folder: str = f'{strip_bundle_ext(filepath)}_converted'
+
+                if not USE_SPINNER:
+                    print(f"{CYAN}Processing bundle:{RESET} {os.path.basename(file)}")
+
+                failed_count += process_bundle(filepath, conversion_folder, shard)
 
             # If the file is a single file, process just the single file
             elif os.path.isfile(file):
@@ -668,7 +1972,7 @@ def convert_music_files() -> None:
                 if not USE_SPINNER:
                     print(f"{CYAN}Processing File:{RESET} {os.path.basename(file)}")
 
-                process_files(base_folder, conversion_folder, [file])
+                failed_count += process_files(base_folder, conversion_folder, [file], shard=shard, inputs_only=True)
 
     finally:
         done_flag.set()
@@ -678,8 +1982,331 @@ def convert_music_files() -> None:
         else:
             sys.stderr.write(f"{GREEN_79}✓{RESET} {GRAY_245}All files processed.{RESET}\n")
         sys.stdout.flush()
+        stop_error_logging()
+
+    print(f"{GRAY_245}Wrote {write_counts['written']} file(s), {write_counts['unchanged']} unchanged, "
+          f"{write_counts['skipped']} skipped (already converted).{RESET}")
+
+    if USE_PIPELINE and use_autotune:
+        read_workers, transform_workers, write_workers = pipeline_workers
+        print(f"{GRAY_245}Autotuned workers: read={read_workers}, transform={transform_workers}, write={write_workers} "
+              f"(pin with --workers {read_workers},{transform_workers},{write_workers}){RESET}")
+
+    if failed_count:
+        print(f"{RED}{failed_count} file(s) failed to convert, see {ERROR_REPORT_PATH} for details.{RESET}")
+
+    return failed_count
+
+
+def read_source_crcs(source_path: str, data: bytes = None) -> set[int]:
+    ''' Reads the CRC of every member of an .mmrs source file, or of the whole file for a .zseq source '''
+    if source_path.endswith('.mmrs'):
+        with zipfile.ZipFile(source_path if data is None else io.BytesIO(data), 'r') as zip_archive:
+            return {info.CRC for info in zip_archive.infolist() if not info.is_dir()}
+
+    if data is not None:
+        return {zlib.crc32(data)}
+
+    with open(source_path, 'rb') as f:
+        return {zlib.crc32(f.read())}
+
+
+def read_bundle_crcs(bundle_path: str) -> dict[str, set[int] | Exception]:
+    ''' Reads the source CRCs of every music file in a bundle in one pass, keyed by manifest path '''
+    crcs: dict[str, set[int] | Exception] = {}
+
+    for _, member_path, data in MusicBundle(bundle_path).members():
+        if member_path is None:
+            continue
+        try:
+            crcs[member_path] = read_source_crcs(member_path, data)
+        except zipfile.BadZipFile as e:
+            crcs[member_path] = e
+
+    return crcs
+
+
+def validate_metadata(metadata, members: set[str]) -> list[str]:
+    ''' Checks a parsed .metadata file against the layout written by write_metadata '''
+    if not isinstance(metadata, dict) or metadata.get("game") != "mm":
+        return ["Metadata is missing 'game: mm'"]
+
+    song_metadata = metadata.get("metadata")
+    if not isinstance(song_metadata, dict):
+        return ["Metadata is missing the 'metadata' section"]
+
+    problems: list[str] = []
+
+    for key in metadata.keys() - {"game", "metadata", "formmask"}:
+        problems.append(f"Metadata has an unknown key: {key}")
+
+    if not isinstance(song_metadata.get("display name"), str):
+        problems.append("Metadata has no display name")
+
+    instrument_set = song_metadata.get("instrument set")
+    if instrument_set == 'custom':
+        if not any(m.endswith('.zbank') for m in members) or not any(m.endswith('.bankmeta') for m in members):
+            problems.append("Custom instrument set is missing its .zbank or .bankmeta")
+    elif not isinstance(instrument_set, int) or not 0 <= instrument_set <= 0x27:
+        problems.append(f"Invalid instrument set: {instrument_set}")
+
+    if song_metadata.get("song type") not in ('bgm', 'fanfare'):
+        problems.append(f"Invalid song type: {song_metadata.get('song type')}")
+
+    music_groups = song_metadata.get("music groups")
+    if not isinstance(music_groups, list) or not music_groups:
+        problems.append("Metadata has no music groups")
+    else:
+        for group in music_groups:
+            if isinstance(group, str) and USE_CATEGORY_ENUM and group in Category.__members__:
+                continue
+            if isinstance(group, int) and not isinstance(group, bool):
+                continue
+            problems.append(f"Invalid music group: {group}")
+
+    audio_samples = song_metadata.get("audio samples", {})
+    if not isinstance(audio_samples, dict):
+        problems.append("Invalid audio samples")
+    else:
+        for sample_name in audio_samples:
+            zsound = sample_name if sample_name.endswith('.zsound') else f"{sample_name}.zsound"
+            if zsound not in members:
+                problems.append(f"Audio sample has no .zsound file: {sample_name}")
+
+    formmask = metadata.get("formmask")
+    if formmask is not None and (not isinstance(formmask, dict) or not all(isinstance(v, list) for v in formmask.values())):
+        problems.append("Invalid formmask")
+
+    return problems
+
+
+def verify_output(mmrs_path: str, source_path: str = None, source_crcs: set[int] | Exception = None) -> list[str]:
+    ''' Verifies a converted .mmrs file using its central directory, its .metadata, and its source file's CRCs '''
+    try:
+        with zipfile.ZipFile(mmrs_path, 'r') as zip_archive:
+            infos = [info for info in zip_archive.infolist() if not info.is_dir()]
+            members = {info.filename for info in infos}
+
+            metadata_files = [m for m in members if m.endswith('.metadata')]
+            if len(metadata_files) != 1:
+                return [f"Expected one .metadata file, found {len(metadata_files)}"]
+
+            metadata_file = metadata_files[0]
+            metadata = yaml.safe_load(zip_archive.read(metadata_file))
+
+    except (zipfile.BadZipFile, yaml.YAMLError, OSError) as e:
+        return [str(e)]
+
+    problems: list[str] = []
+
+    if f"{os.path.splitext(metadata_file)[0]}.seq" not in members:
+        problems.append(f"Missing sequence file for {metadata_file}")
+
+    problems.extend(validate_metadata(metadata, members))
+
+    # Every file except the .metadata is a copy of a file in the source, so its CRC must be in the source
+    if source_path is not None:
+        try:
+            if source_crcs is None:
+                source_crcs = read_source_crcs(source_path)
+            elif isinstance(source_crcs, Exception):
+                raise source_crcs
+        except (zipfile.BadZipFile, OSError) as e:
+            problems.append(f"Could not read source file {source_path}: {e}")
+        else:
+            for info in infos:
+                if info.filename != metadata_file and info.CRC not in source_crcs:
+                    problems.append(f"{info.filename} does not match any file in {source_path}")
+
+    return problems
+
+
+def verify_folder(conversion_folder: str) -> dict[str, list[str]]:
+    ''' Verifies every .mmrs file in a conversion folder, returning the problems found for each file '''
+    results: dict[str, list[str]] = {}
+    sources: dict[str, str] = {}
+    source_crcs: dict[str, set[int] | Exception] = {}
+
+    manifest = load_manifest(conversion_folder)
+    if manifest is not None:
+        source_root = manifest["source root"]
+
+        # Runs on individual files only cover those files
+        if "inputs" in manifest:
+            source_files = manifest["inputs"]
+
+        # Bundle members can't be opened on their own, so read their names and CRCs in one pass over the bundle
+        elif os.path.isfile(source_root) and is_bundle(source_root):
+            bundle_crcs = read_bundle_crcs(source_root)
+            source_files = list(bundle_crcs)
+            source_crcs = {from_manifest_path(source, source_root): crcs for source, crcs in bundle_crcs.items()}
+
+        else:
+            source_files = list_source_files(source_root)
+
+        for source, outputs in manifest["files"].items():
+            source_path = from_manifest_path(source, source_root)
+            for output in outputs:
+                mmrs_path = from_manifest_path(output, conversion_folder)
+                if os.path.isfile(mmrs_path):
+                    sources[mmrs_path] = source_path
+                else:
+                    results[mmrs_path] = [f"Converted file is missing for {source_path}"]
+
+        # Every music file in the source folder or bundle should have been converted
+        for source in source_files:
+            if source not in manifest["files"]:
+                results[from_manifest_path(source, source_root)] = ["Source file was not converted"]
+
+    mmrs_paths = [
+        os.path.join(root, name)
+        for root, _, files in os.walk(conversion_folder)
+        for name in files
+        if name.endswith('.mmrs')
+    ]
+
+    with ThreadPoolExecutor() as executor:
+        futures = {
+            mmrs_path: executor.submit(call_profiled, verify_output, mmrs_path, sources.get(mmrs_path), source_crcs.get(sources.get(mmrs_path)))
+            for mmrs_path in mmrs_paths
+        }
+
+    for mmrs_path, future in futures.items():
+        results[mmrs_path] = future.result()
+
+    return results
+
+
+def verify_music_files(files: list[str]) -> int:
+    ''' Main function to verify converted folders and files, returning the number of files with problems '''
+    global spinner_thread
+
+    # Verify runs write their own report, so the report of the last conversion is kept for triage
+    start_error_logging(VERIFY_REPORT_PATH)
+    spinner_thread = start_spinner("Verifying files...")
+    results: dict[str, list[str]] = {}
+
+    try:
+        for file in files:
+            filepath = os.path.abspath(file)
+
+            if os.path.isdir(file):
+                results.update(verify_folder(filepath))
+
+            elif os.path.isfile(file):
+                results[filepath] = verify_output(filepath)
+
+    finally:
+        done_flag.set()
+        spinner_thread.join()
+        sys.stdout.flush()
+
+    failed_count = 0
+    for filepath, problems in sorted(results.items()):
+        if not problems:
+            continue
+
+        failed_count += 1
+        print(f"{RED}Mismatch in {filepath}:{RESET}")
+        for problem in problems:
+            print(f"{YELLOW}  {problem}{RESET}")
+            log_error(f"Mismatch in {filepath}: {problem}", exc_info=False, input_file=filepath, stage='verify', reason=problem)
+
+    stop_error_logging()
+
+    print(f"{GREEN_79}✓{RESET} {GRAY_245}Verified {len(results)} file(s), {failed_count} with mismatches.{RESET}")
+    if failed_count:
+        print(f"{RED}See {VERIFY_REPORT_PATH} for details.{RESET}")
+
+    return failed_count
+
+
+def merge_music_shards(files: list[str]) -> int:
+    ''' Main function to merge the shard manifests of conversion folders, returning the number of problems found '''
+    problem_count = 0
+
+    for file in files:
+        problems = merge_shards(os.path.abspath(file))
+        problem_count += len(problems)
+
+        for problem in problems:
+            print(f"{YELLOW}{problem}{RESET}")
+
+        print(f"{GREEN_79}✓{RESET} {GRAY_245}Merged shard manifests in {file}, {len(problems)} problem(s) found.{RESET}")
+
+    return problem_count
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    ''' Parses a shard in the i/N format, where i counts from 0 '''
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"shard must be in the i/N format: {value}")
+
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be from 0 to N-1: {value}")
+
+    return index, count
+
+
+def parse_workers(value: str) -> list[int]:
+    ''' Parses pipeline worker counts in the READ,TRANSFORM,WRITE format '''
+    try:
+        worker_counts = [int(part) for part in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"workers must be in the READ,TRANSFORM,WRITE format: {value}")
+
+    if len(worker_counts) != 3 or min(worker_counts) < 1:
+        raise argparse.ArgumentTypeError(f"workers must be three counts of at least 1: {value}")
+
+    return worker_counts
+
+
+def parse_arguments(argv: list[str]) -> argparse.Namespace:
+    ''' Parses the command line, where any files dragged onto the script are positional arguments '''
+    parser = argparse.ArgumentParser(description='Converts .zseq and .mmrs music files to the YAML metadata .mmrs format.')
+    parser.add_argument('files', nargs='*', help='folders, files, or .zip/.tar bundles to convert')
+    parser.add_argument('--verify', action='store_true', help='verify converted folders or .mmrs files instead of converting')
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N', help='only convert shard i of N (counting from 0), writing a partial manifest')
+    parser.add_argument('--merge-shards', action='store_true', help='merge the shard manifests of converted folders and check for overlaps or gaps')
+    parser.add_argument('--workers', type=parse_workers, metavar='R,T,W', help='pin the read, transform, and write worker counts instead of autotuning them')
+    parser.add_argument('--profile', action='store_true', help='profile every thread and save the merged stats')
+    parser.add_argument('--profile-output', default='mmr-music-updater.pstats', metavar='PATH', help='file to save the merged profile stats to (default: %(default)s)')
+    parser.add_argument('--profile-memory', action='store_true', help='also record the tracemalloc peak of each conversion stage while profiling')
+    parser.add_argument('--profile-top', type=int, default=20, metavar='N', help='number of functions to show in the profile summary (default: %(default)s)')
+
+    args = parser.parse_args(argv)
+
+    # Never let the stats file replace a folder or a file dragged onto the script
+    if args.profile or args.profile_memory:
+        if os.path.isdir(args.profile_output):
+            parser.error(f"--profile-output is a folder: {args.profile_output}")
+        if os.path.exists(args.profile_output) and not args.profile_output.lower().endswith('.pstats'):
+            parser.error(f"--profile-output would overwrite a file that is not a .pstats file: {args.profile_output}")
+
+    return args
 
 
 if __name__ == '__main__':
-    convert_music_files()
+    args = parse_arguments(sys.argv[1:])
+
+    if args.workers:
+        pipeline_workers = args.workers
+        use_autotune = False
+
+    if args.profile or args.profile_memory:
+        start_profiling(args.profile_output, args.profile_memory)
+
+    if args.verify:
+        failed_count = verify_music_files(args.files)
+    elif args.merge_shards:
+        failed_count = merge_music_shards(args.files)
+    else:
+        failed_count = convert_music_files(args.files, args.shard)
+
+    if _profiler is not None:
+        stop_profiling(args.profile_top)
+
     os.system('pause')
+    sys.exit(1 if failed_count else 0)
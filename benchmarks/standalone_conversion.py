@@ -0,0 +1,67 @@
+''' Benchmarks .zseq conversion speed of the in-memory path against the temp folder path '''
+import os
+import sys
+import time
+import random
+import tempfile
+import importlib.util
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATH = os.path.join(ROOT_DIR, 'MMR Music Updater.py')
+
+FILE_COUNT = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+FILE_SIZE = 4096
+
+
+def load_updater():
+    ''' Imports the updater script as a module, since its filename is not importable '''
+    sys.path.insert(0, ROOT_DIR)
+    spec = importlib.util.spec_from_file_location('mmr_music_updater', SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_sequences(folder: str) -> list[str]:
+    ''' Writes randomized .zseq files named in the standalone format '''
+    rng = random.Random(0)
+    files = []
+
+    for i in range(FILE_COUNT):
+        path = os.path.join(folder, f'Song {i}_{rng.randrange(0x28):X}_0-1.zseq')
+        with open(path, 'wb') as f:
+            f.write(rng.randbytes(FILE_SIZE))
+        files.append(path)
+
+    return files
+
+
+def benchmark(updater, files: list[str], fast: bool) -> float:
+    ''' Converts every file and returns the files converted per second '''
+    updater.USE_FAST_STANDALONE = fast
+
+    with tempfile.TemporaryDirectory(prefix='zseq_bench_out_') as destination_dir:
+        start = time.perf_counter()
+        for input_file in files:
+            updater.convert_standalone(input_file, destination_dir)
+        elapsed = time.perf_counter() - start
+
+    return len(files) / elapsed
+
+
+def main() -> None:
+    updater = load_updater()
+
+    with tempfile.TemporaryDirectory(prefix='zseq_bench_in_') as input_dir:
+        files = create_sequences(input_dir)
+
+        temp_rate = benchmark(updater, files, fast=False)
+        memory_rate = benchmark(updater, files, fast=True)
+
+    print(f"Temp folder path: {temp_rate:10.1f} files/sec")
+    print(f"In-memory path:   {memory_rate:10.1f} files/sec")
+    print(f"Speedup:          {memory_rate / temp_rate:10.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+''' Checks that converting the same inputs twice gives byte-identical .mmrs files on every conversion path '''
+import os
+import sys
+import time
+import random
+import hashlib
+import tarfile
+import zipfile
+import tempfile
+import contextlib
+import importlib.util
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATH = os.path.join(ROOT_DIR, 'MMR Music Updater.py')
+
+
+def load_updater():
+    ''' Imports the updater script as a module, since its filename is not importable '''
+    sys.path.insert(0, ROOT_DIR)
+    spec = importlib.util.spec_from_file_location('mmr_music_updater', SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def create_corpus(folder: str) -> None:
+    ''' Writes .zseq files and old-format .mmrs files, including a custom bank with samples, into a nested folder '''
+    rng = random.Random(0)
+
+    # A bank with one instrument whose primary sample is at address 0x12345
+    bank = bytearray(0x40)
+    bank[0x08:0x0C] = (0x10).to_bytes(4, 'big')
+    bank[0x20:0x24] = (0x30).to_bytes(4, 'big')
+    bank[0x34:0x38] = (0x12345).to_bytes(4, 'big')
+    bankmeta = bytes([0, 0, 0, 0, 1, 0, 0, 0])
+
+    for i in range(4):
+        subfolder = os.path.join(folder, 'nested') if i % 2 else folder
+        os.makedirs(subfolder, exist_ok=True)
+
+        with open(os.path.join(subfolder, f'Song {i}_{i:X}_0-1.zseq'), 'wb') as f:
+            f.write(rng.randbytes(2048))
+
+        with zipfile.ZipFile(os.path.join(subfolder, f'Custom {i}.mmrs'), 'w') as zip_archive:
+            zip_archive.writestr('28.zseq', rng.randbytes(3072))
+            zip_archive.writestr('28.zbank', bytes(bank))
+            zip_archive.writestr('28.bankmeta', bankmeta)
+            zip_archive.writestr('Piano_12345.zsound', rng.randbytes(512))
+            zip_archive.writestr('54321.zsound', rng.randbytes(512))
+            zip_archive.writestr('28.formmask', '["All", "", "Day1, Day2"]')
+            zip_archive.writestr('categories.txt', '0,1,2')
+
+        with zipfile.ZipFile(os.path.join(subfolder, f'Multi {i}.mmrs'), 'w') as zip_archive:
+            zip_archive.writestr('04.seq', rng.randbytes(256))
+            zip_archive.writestr('03.zseq', rng.randbytes(256))
+            zip_archive.writestr('categories.txt', '8-9')
+
+
+def create_bundles(folder: str, corpus: str) -> list[str]:
+    ''' Packs the corpus into a .zip bundle and a .tar.gz bundle '''
+    zip_path = os.path.join(folder, 'Zipped Library.zip')
+    tar_path = os.path.join(folder, 'Tarred Library.tar.gz')
+
+    with zipfile.ZipFile(zip_path, 'w') as zip_bundle, tarfile.open(tar_path, 'w:gz') as tar_bundle:
+        for root, _, files in os.walk(corpus):
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                zip_bundle.write(path, os.path.relpath(path, corpus))
+                tar_bundle.add(path, os.path.relpath(path, corpus))
+
+    return [zip_path, tar_path]
+
+
+def hash_outputs(folder: str) -> dict[str, str]:
+    ''' Gets the SHA-256 of every .mmrs file in each conversion folder, keyed by its path relative to the folder '''
+    hashes = {}
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if name.endswith('.mmrs') and '_converted' in os.path.relpath(path, folder):
+                with open(path, 'rb') as f:
+                    hashes[os.path.relpath(path, folder).replace(os.sep, '/')] = hashlib.sha256(f.read()).hexdigest()
+
+    return hashes
+
+
+def convert(updater, folder: str, inputs: list[str], use_pipeline: bool) -> dict[str, str]:
+    ''' Converts the inputs into fresh conversion folders and hashes the outputs '''
+    for name in os.listdir(folder):
+        if name.endswith('_converted'):
+            updater.shutil.rmtree(os.path.join(folder, name))
+
+    # The threaded path with the temp folder .zseq conversion is the other way files can be packed
+    updater.USE_PIPELINE = use_pipeline
+    updater.USE_FAST_STANDALONE = use_pipeline
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull), contextlib.redirect_stderr(devnull):
+        failed_count = updater.convert_music_files(inputs)
+
+    assert failed_count == 0
+    return hash_outputs(folder)
+
+
+def test_identical_inputs_give_identical_outputs() -> None:
+    updater = load_updater()
+    assert updater.USE_DETERMINISTIC_ARCHIVES
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='mmrs_determinism_') as folder:
+        # Error reports are written to the working directory
+        os.chdir(folder)
+        try:
+            corpus = os.path.join(folder, 'Library')
+            create_corpus(corpus)
+            inputs = [corpus] + create_bundles(folder, corpus)
+
+            first_runs = [convert(updater, folder, inputs, use_pipeline) for use_pipeline in (True, False)]
+
+            # Zip timestamps have a two second resolution, so wait long enough for the clock to show up in the output
+            time.sleep(2.1)
+            second_runs = [convert(updater, folder, inputs, use_pipeline) for use_pipeline in (True, False)]
+
+        finally:
+            os.chdir(cwd)
+
+    # Every .zseq, every sequence of every .mmrs, for the folder and both bundles
+    assert len(first_runs[0]) == 3 * (4 + 4 + 8)
+    for hashes in first_runs[1:] + second_runs:
+        assert hashes == first_runs[0]
+
+
+if __name__ == '__main__':
+    test_identical_inputs_give_identical_outputs()
+    print("Converting the same inputs twice gave identical outputs on every path.")